@@ -47,7 +47,14 @@ if ! pip show flask > /dev/null 2>&1; then
     pip install flask flask-wtf
 fi
 
-# Start the Flask server
+# Start the server. Prefer gunicorn with preforked workers so concurrent
+# uploads are processed in parallel; fall back to the Flask dev server.
 echo "Starting the web demo at http://localhost:${PORT}"
 echo "Press Ctrl+C to stop the server"
-python -m flask run --host=0.0.0.0 --port=${PORT} 
\ No newline at end of file
+if command -v gunicorn > /dev/null 2>&1; then
+    WORKERS=$(nproc 2> /dev/null || sysctl -n hw.ncpu 2> /dev/null || echo 2)
+    PRELOAD_COMPONENTS=1 gunicorn -w "${WORKERS}" -k gthread --threads 2 --preload \
+        -b "0.0.0.0:${PORT}" src.app:app
+else
+    python -m flask run --host=0.0.0.0 --port=${PORT}
+fi 
\ No newline at end of file
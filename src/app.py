@@ -2,15 +2,34 @@
 
 import os
 import sys
-import json
+import hashlib
 import logging
+import functools
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
 import flask
+import orjson
 from flask import Flask, request, render_template, jsonify, send_from_directory
+from flask.json.provider import DefaultJSONProvider
+from jinja2 import FileSystemBytecodeCache
 from werkzeug.utils import secure_filename
 
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+
 # Add the current directory to the path so imports work correctly
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
 
@@ -18,32 +37,169 @@ from src.document_processor.extractor import DocumentExtractor
 from src.entity_mapper.mapper import EntityMapper, EntityDatabase
 from src.entity_mapper.schema import Entity, MappingResult
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Configure logging through a queue so request threads only enqueue records;
+# a single background listener thread does the formatting and stderr writes,
+# keeping stream-lock contention off the hot path
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 )
+_root_logger = logging.getLogger()
+_root_logger.setLevel(logging.INFO)
+_root_logger.addHandler(QueueHandler(_log_queue))
+_log_listener = QueueListener(_log_queue, _log_stream_handler)
+_log_listener.start()
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for faster response serialization."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def _dump_json(obj: Any, path: Path) -> None:
+    """Serialize an object to a JSON file with orjson."""
+    Path(path).write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+
+# Small pool for overlapping independent result-file writes; write() releases
+# the GIL so both files make progress concurrently
+_io_pool = ThreadPoolExecutor(max_workers=4)
+
 # Initialize Flask application
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'default-dev-key')
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'uploads')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
+app.config['MAX_FORM_MEMORY_SIZE'] = 1 << 20  # Spool uploads >1MB to temp files
 app.config['ALLOWED_EXTENSIONS'] = {'pdf', 'png', 'jpg', 'jpeg'}
+# Compress JSON/HTML responses when flask-compress is installed; entity
+# payloads are highly repetitive and shrink 5-10x
+if COMPRESS_AVAILABLE:
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'zstd', 'gzip']
+    app.config['COMPRESS_MIN_SIZE'] = 1024
+    Compress(app)
+
+# Templates are static for the life of the process: skip the per-request
+# mtime stat and persist compiled template bytecode across restarts
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+app.jinja_env.auto_reload = False
+_jinja_cache_dir = os.path.join(tempfile.gettempdir(), 'boon_jinja_cache')
+os.makedirs(_jinja_cache_dir, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(_jinja_cache_dir)
+
+# Let a fronting server (nginx/apache) serve static files via sendfile()
+# when X-Sendfile/X-Accel-Redirect support is available
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+
+# Hot-path constants: bind the allowed-extension set and upload folder once
+# so per-request checks skip the config dict lookups
+_ALLOWED_EXTENSIONS = frozenset(app.config['ALLOWED_EXTENSIONS'])
+UPLOAD_DIR = Path(app.config['UPLOAD_FOLDER'])
+
+# secure_filename runs a Unicode normalize plus regex sub; browsers resend
+# the same names constantly, so memoize it
+_secure_filename = functools.lru_cache(maxsize=1024)(secure_filename)
+
+# Most browser filenames are already plain ASCII with no separators; those
+# can skip the normalize/regex work entirely (the negative lookahead rules
+# out dot-only names like "..")
+_SAFE_FILENAME_RE = re.compile(r'^(?!\.+$)[A-Za-z0-9._-]{1,128}$')
 
-# Ensure upload directory exists
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Leading magic bytes per allowed extension; a mismatched upload is rejected
+# before it is written to disk or fed to the extraction pipeline
+_MAGIC_BYTES = {
+    'pdf': (b'%PDF-',),
+    'png': (b'\x89PNG\r\n\x1a\n',),
+    'jpg': (b'\xff\xd8\xff',),
+    'jpeg': (b'\xff\xd8\xff',),
+}
+
+def _content_matches_extension(stream, ext: str) -> bool:
+    """Check that a stream's leading bytes match its claimed extension."""
+    head = stream.read(8)
+    stream.seek(0)
+    prefixes = _MAGIC_BYTES.get(ext)
+    return prefixes is None or any(head.startswith(p) for p in prefixes)
+
+# Ensure upload and results directories exist; per-document subdirectories
+# then need only a single non-recursive mkdir each
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+RESULTS_ROOT = Path('results')
+RESULTS_ROOT.mkdir(exist_ok=True)
 
 # Initialize components
 extractor = None
 mapper = None
 database = None
 
+# In-memory LRU cache of processing results keyed by SHA-256 of the uploaded
+# bytes, so re-uploading the same document skips extraction and mapping
+RESULT_CACHE_SIZE = 512
+_result_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_result_cache_lock = threading.RLock()
+_result_cache_db_mtime = None
+
+def _db_mtime() -> Optional[float]:
+    """Return the mtime of the entity database file, if one is configured."""
+    db_path = os.environ.get("DB_PATH")
+    if db_path and os.path.exists(db_path):
+        return os.path.getmtime(db_path)
+    return None
+
+def _cached_result(digest: str) -> Optional[Dict[str, Any]]:
+    """Look up a cached processing result, invalidating on database changes."""
+    global _result_cache_db_mtime
+    with _result_cache_lock:
+        mtime = _db_mtime()
+        if mtime != _result_cache_db_mtime:
+            _result_cache.clear()
+            _result_cache_db_mtime = mtime
+            return None
+        result = _result_cache.get(digest)
+        if result is not None:
+            _result_cache.move_to_end(digest)
+        return result
+
+def _store_result(digest: str, result: Dict[str, Any]) -> None:
+    """Store a processing result in the LRU cache."""
+    with _result_cache_lock:
+        _result_cache[digest] = result
+        _result_cache.move_to_end(digest)
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+# Background job queue so uploads can return 202 immediately instead of
+# holding the HTTP connection open for the whole extraction + mapping run
+JOB_HISTORY_SIZE = 256
+_job_pool = ThreadPoolExecutor(max_workers=int(os.environ.get('JOB_WORKERS', '4')))
+_jobs: "OrderedDict[str, Future]" = OrderedDict()
+_jobs_lock = threading.RLock()
+
+def _enqueue_job(fn, *args) -> str:
+    """Submit a background job and return its ID."""
+    job_id = uuid.uuid4().hex
+    with _jobs_lock:
+        _jobs[job_id] = _job_pool.submit(fn, *args)
+        while len(_jobs) > JOB_HISTORY_SIZE:
+            old_id, old_future = _jobs.popitem(last=False)
+            if not old_future.done():
+                # Keep unfinished jobs; drop the oldest finished one instead
+                _jobs[old_id] = old_future
+                _jobs.move_to_end(old_id, last=False)
+                break
+    return job_id
+
 def allowed_file(filename):
     """Check if the file extension is allowed."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
+    # rpartition scans the string once in C and avoids the list allocation
+    # that rsplit would make on this per-request path
+    _, sep, ext = filename.rpartition('.')
+    return bool(sep) and ext.lower() in _ALLOWED_EXTENSIONS
 
 def init_components():
     """Initialize document extractor and entity mapper components."""
@@ -72,10 +228,23 @@ def init_components():
         
         logger.info("Components initialized successfully")
 
+@app.route('/healthz')
+def healthz():
+    """Readiness probe: 200 once components are initialized, else 503."""
+    if extractor is not None:
+        return jsonify({'status': 'ready'})
+    return jsonify({'status': 'initializing'}), 503
+
+_index_html = None
+
 @app.route('/')
 def index():
     """Render the main page."""
-    return render_template('index.html')
+    # The page is static, so render once and serve the cached bytes
+    global _index_html
+    if _index_html is None:
+        _index_html = render_template('index.html')
+    return _index_html, 200, {'Content-Type': 'text/html; charset=utf-8'}
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
@@ -91,28 +260,95 @@ def upload_file():
         return jsonify({'error': 'No file selected'}), 400
     
     if file and allowed_file(file.filename):
+        # Reject content that does not match its claimed type before paying
+        # for the disk write and the extraction pipeline
+        ext = file.filename.rpartition('.')[2].lower()
+        if not _content_matches_extension(file.stream, ext):
+            return jsonify({'error': 'File content does not match its extension'}), 415
+
         # Secure the filename to prevent directory traversal attacks
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        
-        # Save the file
-        file.save(file_path)
+        if _SAFE_FILENAME_RE.match(file.filename):
+            filename = file.filename
+        else:
+            filename = _secure_filename(file.filename)
+        file_path = UPLOAD_DIR / filename
+
+        # Skip the disk write only when the upload's bytes are already on
+        # disk; a bare size match can alias two different uploads that
+        # share a filename, so compare content digests instead
+        hasher = hashlib.sha256()
+        for chunk in iter(lambda: file.stream.read(1 << 20), b''):
+            hasher.update(chunk)
+        file.stream.seek(0)
+        incoming_digest = hasher.hexdigest()
+
+        on_disk_digest = None
+        if file_path.exists():
+            with open(file_path, 'rb') as f:
+                on_disk_digest = hashlib.file_digest(f, 'sha256').hexdigest()
+
+        if incoming_digest != on_disk_digest:
+            # Stream the upload to disk in 1MB chunks so memory per
+            # in-flight request stays bounded regardless of upload size
+            with open(file_path, 'wb') as dst:
+                shutil.copyfileobj(file.stream, dst, length=1 << 20)
         
+        # Enqueue the heavy work and return immediately when the client
+        # asked for asynchronous processing
+        if request.form.get('async', '').lower() in ('1', 'true', 'yes'):
+            job_id = _enqueue_job(_process_upload, file_path)
+            return jsonify({'job_id': job_id}), 202
+
         try:
-            # Initialize components if not already done
-            init_components()
-            
-            # Process the document
-            result = process_document(Path(file_path))
-            
-            # Return the result as JSON
-            return jsonify(result)
+            return _json_response(_process_upload(file_path))
         except Exception as e:
-            logger.exception(f"Error processing document: {e}")
+            logger.exception("Error processing document: %s", e)
             return jsonify({'error': str(e)}), 500
-    
+
     return jsonify({'error': 'File type not allowed'}), 400
 
+@app.route('/results/<job_id>/status')
+def job_status(job_id):
+    """Report the status (and result, when done) of a background job."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    if not job.done():
+        return jsonify({'job_id': job_id, 'status': 'running'})
+    error = job.exception()
+    if error is not None:
+        return jsonify({'job_id': job_id, 'status': 'failed', 'error': str(error)}), 500
+    return jsonify({'job_id': job_id, 'status': 'finished', 'result': job.result()})
+
+def _json_response(result: Dict[str, Any]) -> flask.Response:
+    """Build a JSON response with an ETag, answering If-None-Match with 304."""
+    payload = orjson.dumps(result)
+    etag = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(payload, mimetype='application/json')
+    response.set_etag(etag)
+    return response
+
+def _process_upload(file_path: Path) -> Dict[str, Any]:
+    """Process a saved upload, consulting the content-hash result cache."""
+    # Return a cached result if we have already processed these bytes
+    with open(file_path, 'rb') as f:
+        digest = hashlib.file_digest(f, 'sha256').hexdigest()
+    result = _cached_result(digest)
+    if result is not None:
+        return result
+
+    # Initialize components if not already done
+    init_components()
+
+    # Process the document
+    result = process_document(Path(file_path))
+    _store_result(digest, result)
+    return result
+
 @app.route('/results/<filename>')
 def results(filename):
     """Display the results page for a specific document."""
@@ -120,13 +356,16 @@ def results(filename):
 
 @app.route('/static/<path:path>')
 def serve_static(path):
-    """Serve static files."""
-    return send_from_directory('static', path)
+    """Serve static files with conditional GET support."""
+    # conditional=True lets repeat visitors get 304s via ETag/If-None-Match,
+    # and the WSGI file wrapper (or X-Sendfile) moves bytes without copying
+    # them through Python buffers
+    return send_from_directory('static', path, conditional=True, max_age=3600)
 
 def process_document(document_path: Path) -> Dict[str, Any]:
     """Process a document and return extraction and mapping results."""
     # Extract entities
-    logger.info(f"Extracting entities from {document_path}")
+    logger.info("Extracting entities from %s", document_path)
     
     if document_path.suffix.lower() == '.pdf':
         entities = extractor.extract_from_pdf(document_path)
@@ -134,31 +373,45 @@ def process_document(document_path: Path) -> Dict[str, Any]:
         entities = extractor.extract_from_image(document_path)
     
     # Map entities
-    logger.info(f"Mapping {len(entities)} entities to database")
+    logger.info("Mapping %d entities to database", len(entities))
     mapping_results = mapper.map_entities(entities)
     
     # Create structured result
     filename = document_path.name
-    result_dir = Path('results') / document_path.stem
-    result_dir.mkdir(parents=True, exist_ok=True)
+    result_dir = RESULTS_ROOT / document_path.stem
+    try:
+        result_dir.mkdir()
+    except FileExistsError:
+        pass
     
-    # Save extracted entities
+    # Save extracted entities and mapping results; the two writes are
+    # independent, so overlap them and wait for both
     entities_file = result_dir / "extracted_entities.json"
-    entities_data = [entity.dict() for entity in entities]
-    with open(entities_file, "w") as f:
-        json.dump(entities_data, f, indent=2)
-    
-    # Save mapping results
+    entities_data = [entity.model_dump(mode='json') for entity in entities]
     mapping_file = result_dir / "mapping_results.json"
-    mapping_data = [result.dict() for result in mapping_results]
-    with open(mapping_file, "w") as f:
-        json.dump(mapping_data, f, indent=2)
-    
-    # Count mapped entities
-    mapped_count = sum(1 for result in mapping_results if result.mapped_entity_id is not None)
+    # Reuse the dicts just built for entities_data instead of re-serializing
+    # each original_entity inside its MappingResult
+    entity_dumps = {id(entity): data for entity, data in zip(entities, entities_data)}
+    mapping_data = []
+    for result in mapping_results:
+        data = result.model_dump(mode='json', exclude={'original_entity'})
+        data['original_entity'] = (
+            entity_dumps.get(id(result.original_entity))
+            or result.original_entity.model_dump(mode='json')
+        )
+        mapping_data.append(data)
+    writes = [
+        _io_pool.submit(_dump_json, entities_data, entities_file),
+        _io_pool.submit(_dump_json, mapping_data, mapping_file),
+    ]
+    for write in writes:
+        write.result()
     
-    # Count name changes detected
-    name_changes = sum(1 for result in mapping_results if result.name_change_detected)
+    # Count mapped entities and detected name changes in one pass
+    mapped_count = name_changes = 0
+    for result in mapping_results:
+        mapped_count += result.mapped_entity_id is not None
+        name_changes += result.name_change_detected
     
     result = {
         'filename': filename,
@@ -171,9 +424,19 @@ def process_document(document_path: Path) -> Dict[str, Any]:
     
     return result
 
+# Initialize components at import time when requested, so gunicorn --preload
+# loads the extractor/mapper/database once in the master and forked workers
+# share the memory copy-on-write instead of each paying the cold start
+if os.environ.get('PRELOAD_COMPONENTS', '').lower() in ('1', 'true', 'yes'):
+    init_components()
+
 if __name__ == '__main__':
     # Get port from environment or use default
     port = int(os.environ.get('PORT', 5000))
-    
-    # Run the application
-    app.run(host='0.0.0.0', port=port, debug=True) 
\ No newline at end of file
+
+    # Run the development server. In production, run under a preforked WSGI
+    # server instead so concurrent uploads are handled in parallel, e.g.:
+    #   gunicorn -w $(nproc) -k gthread --threads 2 --preload \
+    #       -b 0.0.0.0:$PORT src.app:app
+    debug = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
+    app.run(host='0.0.0.0', port=port, debug=debug)
\ No newline at end of file
@@ -3,26 +3,93 @@ Document extraction module that processes images and extracts structured data
 using Vision-enabled LLMs.
 """
 
+import asyncio
 import os
+import hashlib
 import logging
 import base64
-import json
-import sys
+import tempfile
+import threading
+
+import orjson
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Union
 from io import BytesIO
 
-import numpy as np
 from PIL import Image
-from pdf2image import convert_from_path
-import openai
-import google.generativeai as genai
-import anthropic
 
-# Add parent directory to path to enable imports
-sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+# Provider SDKs (openai) and pdf2image (which probes for Poppler at import)
+# are imported lazily at first use, so mock-mode CLIs and tests don't pay
+# their import cost
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# Responses larger than this are parsed incrementally (when ijson is
+# installed) rather than decoded into one big dict up front
+_STREAM_PARSE_THRESHOLD = 1 << 16
+
+# Shape of a well-formed extraction response, checked before any pydantic
+# construction so malformed payloads fail fast instead of raising mid-build
+_RESPONSE_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "companies": {"type": "array"},
+        "people": {"type": "array"},
+        "shipment": {"type": "object"},
+    },
+}
+
+# fastjsonschema compiles the schema to a specialized function once at
+# import; without it a hand-rolled isinstance check covers the same keys
+try:
+    import fastjsonschema
+    _VALIDATE_RESPONSE = fastjsonschema.compile(_RESPONSE_JSON_SCHEMA)
+except ImportError:
+    fastjsonschema = None
+    _VALIDATE_RESPONSE = None
+
 
-from src.entity_mapper.schema import (
+def _response_shape_ok(data: Any) -> bool:
+    """Return True when the decoded response has the expected top-level shape."""
+    if _VALIDATE_RESPONSE is not None:
+        try:
+            _VALIDATE_RESPONSE(data)
+            return True
+        except fastjsonschema.JsonSchemaException:
+            return False
+    return (
+        isinstance(data, dict)
+        and isinstance(data.get("companies", []), list)
+        and isinstance(data.get("people", []), list)
+        and isinstance(data.get("shipment", {}), dict)
+    )
+
+# The response schema is fixed by the prompt, so pick the fastest available
+# decoder once at import: msgspec's compiled decoder when installed, orjson
+# otherwise. Both raise ValueError subclasses on malformed input.
+try:
+    import msgspec.json
+    _loads_response = msgspec.json.decode
+except ImportError:
+    _loads_response = orjson.loads
+
+from ..entity_mapper.schema import (
     Entity, CompanyEntity, PersonEntity, EntityType, Address, ContactInfo,
     ShipmentEntity, ReferenceNumbers, ShipmentDates, CargoDetails, FinancialDetails,
     LocationEntity
@@ -30,333 +97,61 @@ from src.entity_mapper.schema import (
 
 logger = logging.getLogger(__name__)
 
-class DocumentExtractor:
+# Sparse documents routinely omit whole address/contact blocks; sharing one
+# empty instance skips a model validation per missing block. The fields are
+# never mutated after construction, so aliasing is safe.
+_EMPTY_ADDRESS = Address()
+_EMPTY_CONTACT = ContactInfo()
+
+_ADDR_FIELDS = ("street", "city", "state", "postal_code", "country")
+_CONTACT_FIELDS = ("phone", "email", "fax", "website")
+
+
+def _addr(data: Dict[str, Any]) -> Address:
+    """Build an Address from a decoded block, reusing the empty singleton."""
+    if not data:
+        return _EMPTY_ADDRESS
+    return Address(**{field: data.get(field) for field in _ADDR_FIELDS})
+
+
+def _contact(data: Dict[str, Any]) -> ContactInfo:
+    """Build a ContactInfo from a decoded block, reusing the empty singleton."""
+    if not data:
+        return _EMPTY_CONTACT
+    return ContactInfo(**{field: data.get(field) for field in _CONTACT_FIELDS})
+
+
+def _render_page_b64(pdf_path: str, page_idx: int, dpi: int, detail_level: str) -> str:
     """
-    Extracts structured information from document images using 
-    vision-enabled LLMs.
+    Render one PDF page and return it as a base64 JPEG string.
+
+    Module-level so it can be pickled into a ProcessPoolExecutor worker;
+    each worker opens the document itself rather than shipping pixel data
+    across the process boundary twice.
     """
-    
-    def __init__(
-        self,
-        model: str,
-        api_key: Optional[str] = None,
-        detail_level: str = "high"
-    ):
-        """
-        Initialize document extractor with model and API key.
-        
-        Args:
-            model: Model name to use (e.g., 'gpt-4-vision-preview')
-            api_key: OpenAI API key
-            detail_level: Level of detail for vision analysis ('high', 'medium', 'low')
-        """
-        self.model = model
-        self.detail_level = detail_level
-        
-        # Special handling for mock mode
-        if model.lower() == 'mock':
-            self.client_type = "mock"
-            logger.info("Using mock mode - no API call will be made")
-        else:
-            openai.api_key = api_key or os.environ.get("OPENAI_API_KEY")
-            if not openai.api_key:
-                raise ValueError("OpenAI API key must be provided")
-            self.client_type = "openai"
-        
-    def extract_from_pdf(self, pdf_path: Union[str, Path]) -> List[Entity]:
-        """
-        Extract entities from a PDF document.
-        
-        Args:
-            pdf_path: Path to the PDF file
-            
-        Returns:
-            List of extracted entities
-        """
-        # Convert PDF to images
-        pdf_path = Path(pdf_path)
-        logger.info(f"Processing PDF: {pdf_path}")
-        
-        # Special handling for mock mode
-        if self.client_type == "mock":
-            logger.info("Using mock data for PDF processing")
-            return self._generate_mock_entities(pdf_path.stem)
-        
-        # Normal processing for non-mock mode
-        images = convert_from_path(pdf_path)
-        logger.info(f"Converted PDF to {len(images)} images")
-        
-        # Process each image
-        all_entities = []
-        for i, image in enumerate(images):
-            logger.info(f"Processing page {i+1}/{len(images)}")
-            page_entities = self.extract_from_image(image)
-            all_entities.extend(page_entities)
-            
-        return all_entities
-    
-    def extract_from_image(self, image: Union[str, Path, Image.Image]) -> List[Entity]:
-        """
-        Extract entities from an image.
-        
-        Args:
-            image: Path to image file or PIL Image object
-            
-        Returns:
-            List of extracted entities
-        """
-        # Special handling for mock mode
-        if self.client_type == "mock":
-            logger.info("Using mock data for image processing")
-            # If we have a path, use it to generate appropriate mock entities
-            if isinstance(image, (str, Path)):
-                image_path = Path(image)
-                return self._generate_mock_entities(image_path.stem)
-            # Otherwise, just return generic mock entities
-            return self._generate_mock_entities()
-        
-        # Load image if path is provided
-        if isinstance(image, (str, Path)):
-            image = Image.open(image)
-        
-        return self._extract_with_openai(image)
-    
-    def _generate_mock_entities(self, file_stem: Optional[str] = None) -> List[Entity]:
-        """Generate mock entities based on the file name or generic ones if not provided."""
-        entities = []
-        
-        # Create entities based on the document name if provided
-        if file_stem:
-            if "steves" in file_stem.lower() or "freight_invoice" in file_stem.lower():
-                # Steve's Trucking freight invoice
-                company = CompanyEntity(
-                    name="Steve's Trucking",
-                    type=EntityType.COMPANY,
-                    aliases=["STC"],
-                    industry="trucking",
-                    address=Address(
-                        street="PO Box 915654",
-                        city="Kansas City",
-                        state="MO",
-                        postal_code="64111"
-                    ),
-                    contact=ContactInfo(
-                        phone="(888) 564-6546"
-                    )
-                )
-                
-                customer = CompanyEntity(
-                    name="Customer Company Name",
-                    type=EntityType.COMPANY,
-                    address=Address(
-                        street="7834 18th St.",
-                        city="Dallas",
-                        state="TX",
-                        postal_code="75391"
-                    )
-                )
-                
-                driver = PersonEntity(
-                    name="Driver Name",
-                    type=EntityType.PERSON,
-                    title="Driver",
-                    organization="Steve's Trucking"
-                )
-                
-                entities.extend([company, customer, driver])
-                
-            elif "bennett" in file_stem.lower() or "rate_confirmation" in file_stem.lower():
-                # Bennett International Logistics rate confirmation
-                company = CompanyEntity(
-                    name="Bennett International Logistics, LLC",
-                    type=EntityType.COMPANY,
-                    aliases=["BIL"],
-                    industry="logistics",
-                    address=Address(
-                        street="PO Box 569",
-                        city="McDonough",
-                        state="GA",
-                        postal_code="30253"
-                    ),
-                    contact=ContactInfo(
-                        phone="770-957-1866",
-                        fax="877-251-8541"
-                    )
-                )
-                
-                parent_company = CompanyEntity(
-                    name="BENNETT TRUCK TRANSPORT, LLC",
-                    type=EntityType.COMPANY,
-                    industry="trucking"
-                )
-                
-                carrier = CompanyEntity(
-                    name="GT XPRESS INC",
-                    type=EntityType.COMPANY,
-                    industry="trucking",
-                    contact=ContactInfo(
-                        phone="8773772720"
-                    )
-                )
-                
-                driver = PersonEntity(
-                    name="MARTY ROWE",
-                    type=EntityType.PERSON,
-                    title="Driver",
-                    organization="GT XPRESS INC",
-                    contact=ContactInfo(
-                        phone="5174251761"
-                    )
-                )
-                
-                origin = CompanyEntity(
-                    name="AGRI EMPRESSA",
-                    type=EntityType.COMPANY,
-                    address=Address(
-                        street="6001 W INDUSTRIAL AVE",
-                        city="MIDLAND",
-                        state="TX",
-                        postal_code="79701"
-                    )
-                )
-                
-                destination = CompanyEntity(
-                    name="IDC 301 CYCLONE EA 23H",
-                    type=EntityType.COMPANY,
-                    address=Address(
-                        street="CR 194",
-                        city="SMILEY",
-                        state="TX",
-                        postal_code="78159"
-                    )
-                )
-                
-                entities.extend([company, parent_company, carrier, driver, origin, destination])
-                
-            elif "linbis" in file_stem.lower() or "bill_of_lading" in file_stem.lower():
-                # Linbis Logistics Software bill of lading
-                company = CompanyEntity(
-                    name="Linbis Logistics Software",
-                    type=EntityType.COMPANY,
-                    industry="technology",
-                    address=Address(
-                        street="5406 NW 72 AVE",
-                        city="Miami",
-                        state="FL",
-                        postal_code="33166"
-                    ),
-                    contact=ContactInfo(
-                        phone="(305) 513-8555",
-                        fax="(305) 513-8555",
-                        email="info@linbis.com",
-                        website="www.linbis.com"
-                    )
-                )
-                
-                shipper = CompanyEntity(
-                    name="Sample Company TFASCLO",
-                    type=EntityType.COMPANY,
-                    address=Address(
-                        street="8551 EAST 88 TH STREET",
-                        city="Sample City",
-                        state="CA",
-                        postal_code="55532"
-                    )
-                )
-                
-                consignee = CompanyEntity(
-                    name="Sample Company CODE001",
-                    type=EntityType.COMPANY,
-                    address=Address(
-                        street="88185 NW 51th St Unit 811",
-                        city="Sample City",
-                        state="FL", 
-                        postal_code="55532"
-                    ),
-                    contact=ContactInfo(
-                        phone="7866839976"
-                    )
-                )
-                
-                carrier = CompanyEntity(
-                    name="FEDEX",
-                    type=EntityType.COMPANY,
-                    industry="shipping"
-                )
-                
-                driver = PersonEntity(
-                    name="John Smith",
-                    type=EntityType.PERSON,
-                    title="Driver",
-                    organization="FEDEX"
-                )
-                
-                entities.extend([company, shipper, consignee, carrier, driver])
-        
-        # If no entities created based on file name, create generic ones
-        if not entities:
-            # Generic logistics document entities
-            company = CompanyEntity(
-                name="Example Logistics Corp",
-                type=EntityType.COMPANY,
-                aliases=["ELC", "Example Logistics"],
-                industry="logistics",
-                address=Address(
-                    street="123 Main St",
-                    city="Anytown",
-                    state="CA",
-                    postal_code="90210"
-                ),
-                contact=ContactInfo(
-                    phone="(555) 123-4567",
-                    email="info@examplelogistics.com"
-                )
-            )
-            
-            driver = PersonEntity(
-                name="John Driver",
-                type=EntityType.PERSON,
-                title="Driver",
-                organization="Example Logistics Corp"
-            )
-            
-            entities.extend([company, driver])
-            
-        return entities
-    
-    def _extract_with_openai(self, image: Image.Image) -> List[Entity]:
-        """Extract entities using OpenAI's vision models."""
-        # Convert image to base64
-        buffered = BytesIO()
-        
-        # Convert RGBA to RGB if needed
-        if image.mode == 'RGBA':
-            # Create a white background
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            # Paste the image on the background using the alpha channel
-            background.paste(image, mask=image.split()[3])
-            image = background
-        
-        # Save image as JPEG
-        image.save(buffered, format="JPEG")
-        img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
-        
-        # Create message with image and more structured prompt
-        messages = [
-            {
-                "role": "system",
-                "content": """You are a document analysis system specialized in extracting structured information from logistics documents.
+    doc = fitz.open(pdf_path)
+    try:
+        pix = doc[page_idx].get_pixmap(dpi=dpi)
+        image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    finally:
+        doc.close()
+    if detail_level != "high" and max(image.size) > 2048:
+        image.thumbnail((2048, 2048), Image.Resampling.LANCZOS)
+    buffered = BytesIO()
+    image.save(buffered, format="JPEG", quality=70, optimize=True, subsampling=2)
+    return base64.b64encode(buffered.getbuffer()).decode("ascii")
+
+# The extraction prompt is identical for every page. Keeping it as stable
+# module-level constants avoids rebuilding ~4KB of strings per call and
+# keeps the request prefix byte-stable so provider-side prompt caching
+# can hit on every page after the first.
+_SYSTEM_PROMPT = """You are a document analysis system specialized in extracting structured information from logistics documents.
                 Extract all entities and format them as a clean JSON object.
                 Include ALL information you can find about each entity including addresses, contact info, etc.
                 Pay special attention to shipment details, reference numbers, and financials.
                 Be thorough and extract every detail present in the document."""
-            },
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": """Extract all entities from this logistics document and format as JSON with this structure:
+
+_USER_SCHEMA_PROMPT = """Extract all entities from this logistics document and format as JSON with this structure:
                         {
                           "companies": [
                             {
@@ -450,6 +245,540 @@ class DocumentExtractor:
                             "document_type": "type of document (BOL, invoice, etc.)"
                           }
                         }"""
+
+class DocumentExtractor:
+    """
+    Extracts structured information from document images using 
+    vision-enabled LLMs.
+    """
+    
+    def __init__(
+        self,
+        model: str,
+        api_key: Optional[str] = None,
+        detail_level: str = "high",
+        cache_enabled: bool = True,
+        batch_size: int = 4
+    ):
+        """
+        Initialize document extractor with model and API key.
+
+        Args:
+            model: Model name to use (e.g., 'gpt-4-vision-preview')
+            api_key: OpenAI API key
+            detail_level: Level of detail for vision analysis ('high', 'medium', 'low')
+            cache_enabled: Whether to cache vision responses by page content
+            batch_size: Pages to pack into one vision request when detail
+                allows it (1 disables batching)
+        """
+        self.model = model
+        self.detail_level = detail_level
+        self.cache_enabled = cache_enabled
+        self.batch_size = max(1, batch_size)
+        self._mock_cache: Dict[Optional[str], List[Entity]] = {}
+        self._scratch = threading.local()
+        self._render_pool = None
+        self._async_client = None
+        self._async_client_loop = None
+        self._cache_dir = Path(
+            os.environ.get(
+                "VISION_CACHE_DIR",
+                Path.home() / ".cache" / "boon_ai" / "vision",
+            )
+        )
+
+        # Special handling for mock mode
+        if model.lower() == 'mock':
+            self.client_type = "mock"
+            self._client = None
+            logger.info("Using mock mode - no API call will be made")
+        else:
+            import openai
+            openai.api_key = api_key or os.environ.get("OPENAI_API_KEY")
+            if not openai.api_key:
+                raise ValueError("OpenAI API key must be provided")
+            self.client_type = "openai"
+            # One client instance for all pages, so TLS+TCP handshakes are
+            # amortized over the whole document via connection keep-alive
+            self._client = openai.OpenAI(
+                api_key=openai.api_key,
+                http_client=self._pooled_http_client(httpx.Client) if HTTPX_AVAILABLE else None
+            )
+
+    @staticmethod
+    def _pooled_http_client(client_cls):
+        """Build an httpx client sized for concurrent per-page requests."""
+        return client_cls(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+        )
+        
+    def extract_from_pdf(self, pdf_path: Union[str, Path]) -> List[Entity]:
+        """
+        Extract entities from a PDF document.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            List of extracted entities
+        """
+        # Convert PDF to images
+        pdf_path = Path(pdf_path)
+        logger.info(f"Processing PDF: {pdf_path}")
+        
+        # Special handling for mock mode
+        if self.client_type == "mock":
+            logger.info("Using mock data for PDF processing")
+            return self._generate_mock_entities(pdf_path.stem)
+        
+        # Normal processing for non-mock mode. The per-page vision calls are
+        # network-bound, so overlap them with async fan-out when possible.
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.extract_from_pdf_async(pdf_path))
+
+        # Already inside an event loop (caller should use the async API);
+        # fall back to the serial page loop, rasterizing lazily
+        all_entities = []
+        for i, image in enumerate(self._iter_pdf_pages(pdf_path)):
+            logger.info(f"Processing page {i+1}")
+            page_entities = self.extract_from_image(image)
+            all_entities.extend(page_entities)
+
+        return all_entities
+
+    async def extract_from_pdf_async(self, pdf_path: Union[str, Path], max_concurrency: int = 8) -> List[Entity]:
+        """
+        Extract entities from a PDF with concurrent per-page API calls.
+
+        Args:
+            pdf_path: Path to the PDF file
+            max_concurrency: Maximum number of in-flight vision requests
+
+        Returns:
+            List of extracted entities across all pages, in page order
+        """
+        pdf_path = Path(pdf_path)
+
+        if self.client_type == "mock":
+            return self._generate_mock_entities(pdf_path.stem)
+
+        img_strs = await self._rasterize_pages_async(pdf_path)
+        logger.info(f"Extracting {len(img_strs)} pages concurrently")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        # Pack several pages into one request where the detail level allows
+        # it: the system prompt and schema are sent (and billed) once per
+        # request, and fewer round trips cut tail latency on long PDFs.
+        # High-detail runs stay one page per call to keep response quality.
+        step = self.batch_size if self.detail_level != "high" else 1
+
+        async def extract_pages(batch: List[str]) -> List[Entity]:
+            async with semaphore:
+                if len(batch) == 1:
+                    return await self._extract_encoded_async(batch[0])
+                return await self._extract_batch_encoded_async(batch)
+
+        batches = [img_strs[i:i + step] for i in range(0, len(img_strs), step)]
+        page_results = await asyncio.gather(*(extract_pages(batch) for batch in batches))
+
+        all_entities = []
+        for page_entities in page_results:
+            all_entities.extend(page_entities)
+        return all_entities
+
+    async def _rasterize_pages_async(self, pdf_path: Path, dpi: int = 200) -> List[str]:
+        """
+        Rasterize and JPEG-encode all pages, returning base64 strings.
+
+        Rendering and encoding are CPU-bound and GIL-holding, so long PDFs
+        are farmed out page-per-task to a process pool where they overlap
+        with the network waits of already-submitted pages. Short PDFs stay
+        in-process to avoid the pool spin-up cost.
+        """
+        if PYMUPDF_AVAILABLE:
+            doc = fitz.open(str(pdf_path))
+            page_count = doc.page_count
+            doc.close()
+            if page_count >= 4 and (os.cpu_count() or 1) > 1:
+                loop = asyncio.get_running_loop()
+                pool = self._get_render_pool()
+                return list(await asyncio.gather(*(
+                    loop.run_in_executor(
+                        pool, _render_page_b64, str(pdf_path), i, dpi, self.detail_level
+                    )
+                    for i in range(page_count)
+                )))
+        return [self._encode_image_jpeg(image) for image in self._iter_pdf_pages(pdf_path, dpi)]
+
+    def _get_render_pool(self):
+        """Lazily create the process pool used for page rasterization."""
+        if self._render_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._render_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return self._render_pool
+
+    @staticmethod
+    def _iter_pdf_pages(pdf_path: Path, dpi: int = 200):
+        """
+        Yield PDF pages as PIL images one at a time.
+
+        Prefers PyMuPDF, which renders pages in-process straight into memory;
+        falls back to pdf2image (Poppler subprocess) when it is unavailable.
+        """
+        if PYMUPDF_AVAILABLE:
+            doc = fitz.open(str(pdf_path))
+            try:
+                for page in doc:
+                    pix = page.get_pixmap(dpi=dpi)
+                    yield Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+            finally:
+                doc.close()
+        else:
+            from pdf2image import convert_from_path
+
+            # Spread Poppler decoding across cores and spool pages to a temp
+            # directory so the whole PDF is never decoded into RAM at once
+            with tempfile.TemporaryDirectory() as tmp:
+                yield from convert_from_path(
+                    pdf_path,
+                    dpi=dpi,
+                    fmt="jpeg",
+                    thread_count=max(1, (os.cpu_count() or 2) - 1),
+                    output_folder=tmp,
+                )
+    
+    def extract_from_image(self, image: Union[str, Path, Image.Image]) -> List[Entity]:
+        """
+        Extract entities from an image.
+        
+        Args:
+            image: Path to image file or PIL Image object
+            
+        Returns:
+            List of extracted entities
+        """
+        # Special handling for mock mode
+        if self.client_type == "mock":
+            logger.info("Using mock data for image processing")
+            # If we have a path, use it to generate appropriate mock entities
+            if isinstance(image, (str, Path)):
+                image_path = Path(image)
+                return self._generate_mock_entities(image_path.stem)
+            # Otherwise, just return generic mock entities
+            return self._generate_mock_entities()
+        
+        # Load image if path is provided
+        if isinstance(image, (str, Path)):
+            image = Image.open(image)
+        
+        return self._extract_with_openai(image)
+    
+    def extract_batch(self, documents: List[Union[str, Path]], max_workers: int = 8) -> List[List[Entity]]:
+        """
+        Extract entities from several documents concurrently.
+
+        The per-document extraction is network-bound on the LLM API, so
+        overlapping requests with a thread pool scales throughput with the
+        batch size instead of paying N serial round trips.
+
+        Args:
+            documents: Paths to PDF or image files
+            max_workers: Maximum number of concurrent extraction calls
+
+        Returns:
+            List of entity lists, one per document, in input order
+        """
+        documents = [Path(d) for d in documents]
+        if len(documents) <= 1 or self.client_type == "mock":
+            return [self._extract_any(d) for d in documents]
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(documents))) as pool:
+            return list(pool.map(self._extract_any, documents))
+
+    def _extract_any(self, document_path: Path) -> List[Entity]:
+        """Dispatch a document to the PDF or image extraction path."""
+        if document_path.suffix.lower() == '.pdf':
+            return self.extract_from_pdf(document_path)
+        return self.extract_from_image(document_path)
+
+    def _generate_mock_entities(self, file_stem: Optional[str] = None) -> List[Entity]:
+        """Generate mock entities based on the file name or generic ones if not provided."""
+        # Mock entities are deterministic per file stem, so constructing the
+        # pydantic objects (the dominant cost in mock mode) happens once per
+        # stem; callers treat the entities as read-only, so a shallow copy of
+        # the cached list is enough.
+        cached = self._mock_cache.get(file_stem)
+        if cached is not None:
+            return list(cached)
+
+        entities = []
+        if file_stem:
+            stem_lower = file_stem.lower()
+            for keywords, factory in self._MOCK_FACTORIES:
+                if any(keyword in stem_lower for keyword in keywords):
+                    entities = factory()
+                    break
+
+        if not entities:
+            entities = self._mock_generic_entities()
+
+        self._mock_cache[file_stem] = entities
+        return list(entities)
+
+    @staticmethod
+    def _mock_steves_entities() -> List[Entity]:
+        """Mock entities for the Steve's Trucking freight invoice sample."""
+        # Steve's Trucking freight invoice
+        company = CompanyEntity(
+            name="Steve's Trucking",
+            type=EntityType.COMPANY,
+            aliases=["STC"],
+            industry="trucking",
+            address=Address(
+                street="PO Box 915654",
+                city="Kansas City",
+                state="MO",
+                postal_code="64111"
+            ),
+            contact=ContactInfo(
+                phone="(888) 564-6546"
+            )
+        )
+        
+        customer = CompanyEntity(
+            name="Customer Company Name",
+            type=EntityType.COMPANY,
+            address=Address(
+                street="7834 18th St.",
+                city="Dallas",
+                state="TX",
+                postal_code="75391"
+            )
+        )
+        
+        driver = PersonEntity(
+            name="Driver Name",
+            type=EntityType.PERSON,
+            title="Driver",
+            organization="Steve's Trucking"
+        )
+        
+        return [company, customer, driver]
+
+    @staticmethod
+    def _mock_bennett_entities() -> List[Entity]:
+        """Mock entities for the Bennett rate confirmation sample."""
+        # Bennett International Logistics rate confirmation
+        company = CompanyEntity(
+            name="Bennett International Logistics, LLC",
+            type=EntityType.COMPANY,
+            aliases=["BIL"],
+            industry="logistics",
+            address=Address(
+                street="PO Box 569",
+                city="McDonough",
+                state="GA",
+                postal_code="30253"
+            ),
+            contact=ContactInfo(
+                phone="770-957-1866",
+                fax="877-251-8541"
+            )
+        )
+        
+        parent_company = CompanyEntity(
+            name="BENNETT TRUCK TRANSPORT, LLC",
+            type=EntityType.COMPANY,
+            industry="trucking"
+        )
+        
+        carrier = CompanyEntity(
+            name="GT XPRESS INC",
+            type=EntityType.COMPANY,
+            industry="trucking",
+            contact=ContactInfo(
+                phone="8773772720"
+            )
+        )
+        
+        driver = PersonEntity(
+            name="MARTY ROWE",
+            type=EntityType.PERSON,
+            title="Driver",
+            organization="GT XPRESS INC",
+            contact=ContactInfo(
+                phone="5174251761"
+            )
+        )
+        
+        origin = CompanyEntity(
+            name="AGRI EMPRESSA",
+            type=EntityType.COMPANY,
+            address=Address(
+                street="6001 W INDUSTRIAL AVE",
+                city="MIDLAND",
+                state="TX",
+                postal_code="79701"
+            )
+        )
+        
+        destination = CompanyEntity(
+            name="IDC 301 CYCLONE EA 23H",
+            type=EntityType.COMPANY,
+            address=Address(
+                street="CR 194",
+                city="SMILEY",
+                state="TX",
+                postal_code="78159"
+            )
+        )
+        
+        return [company, parent_company, carrier, driver, origin, destination]
+
+    @staticmethod
+    def _mock_linbis_entities() -> List[Entity]:
+        """Mock entities for the Linbis bill of lading sample."""
+        # Linbis Logistics Software bill of lading
+        company = CompanyEntity(
+            name="Linbis Logistics Software",
+            type=EntityType.COMPANY,
+            industry="technology",
+            address=Address(
+                street="5406 NW 72 AVE",
+                city="Miami",
+                state="FL",
+                postal_code="33166"
+            ),
+            contact=ContactInfo(
+                phone="(305) 513-8555",
+                fax="(305) 513-8555",
+                email="info@linbis.com",
+                website="www.linbis.com"
+            )
+        )
+        
+        shipper = CompanyEntity(
+            name="Sample Company TFASCLO",
+            type=EntityType.COMPANY,
+            address=Address(
+                street="8551 EAST 88 TH STREET",
+                city="Sample City",
+                state="CA",
+                postal_code="55532"
+            )
+        )
+        
+        consignee = CompanyEntity(
+            name="Sample Company CODE001",
+            type=EntityType.COMPANY,
+            address=Address(
+                street="88185 NW 51th St Unit 811",
+                city="Sample City",
+                state="FL", 
+                postal_code="55532"
+            ),
+            contact=ContactInfo(
+                phone="7866839976"
+            )
+        )
+        
+        carrier = CompanyEntity(
+            name="FEDEX",
+            type=EntityType.COMPANY,
+            industry="shipping"
+        )
+        
+        driver = PersonEntity(
+            name="John Smith",
+            type=EntityType.PERSON,
+            title="Driver",
+            organization="FEDEX"
+        )
+        
+        return [company, shipper, consignee, carrier, driver]
+
+    @staticmethod
+    def _mock_generic_entities() -> List[Entity]:
+        """Generic mock entities for unrecognized documents."""
+        # Generic logistics document entities
+        company = CompanyEntity(
+            name="Example Logistics Corp",
+            type=EntityType.COMPANY,
+            aliases=["ELC", "Example Logistics"],
+            industry="logistics",
+            address=Address(
+                street="123 Main St",
+                city="Anytown",
+                state="CA",
+                postal_code="90210"
+            ),
+            contact=ContactInfo(
+                phone="(555) 123-4567",
+                email="info@examplelogistics.com"
+            )
+        )
+        
+        driver = PersonEntity(
+            name="John Driver",
+            type=EntityType.PERSON,
+            title="Driver",
+            organization="Example Logistics Corp"
+        )
+        
+        return [company, driver]
+
+    # Keyword-to-factory dispatch for mock documents; the stem is lowercased
+    # once and each factory builds one sample document's entities.
+    _MOCK_FACTORIES = (
+        (("steves", "freight_invoice"), _mock_steves_entities),
+        (("bennett", "rate_confirmation"), _mock_bennett_entities),
+        (("linbis", "bill_of_lading"), _mock_linbis_entities),
+    )
+
+    def _encode_image_jpeg(self, image: Image.Image) -> str:
+        """Encode an image as base64 JPEG for the vision API."""
+        # Reuse one scratch buffer per thread instead of allocating a fresh
+        # BytesIO (and its grow-copies) for every page encode
+        buffered = getattr(self._scratch, "buf", None)
+        if buffered is None:
+            buffered = self._scratch.buf = BytesIO()
+        buffered.seek(0)
+        buffered.truncate()
+
+        # JPEG has no alpha channel; a single C-level convert handles RGBA as
+        # well as palette/grayscale-alpha modes that would crash the save
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        # Low/medium detail requests don't benefit from full-resolution
+        # pixels, so cap the dimensions before encoding
+        if self.detail_level != "high" and max(image.size) > 2048:
+            image.thumbnail((2048, 2048), Image.Resampling.LANCZOS)
+
+        # Save as JPEG tuned for upload size; bytes on the wire dominate the
+        # vision call latency. getbuffer() hands base64 a memoryview, so no
+        # extra copy is made before encoding.
+        image.save(buffered, format="JPEG", quality=70, optimize=True, subsampling=2)
+        return base64.b64encode(buffered.getbuffer()).decode("ascii")
+
+    def _build_vision_messages(self, img_str: str) -> List[Dict[str, Any]]:
+        """Build the chat messages for a single-image extraction request."""
+        # Create message with image and more structured prompt
+        return [
+            {
+                "role": "system",
+                "content": _SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": _USER_SCHEMA_PROMPT
                     },
                     {
                         "type": "image_url",
@@ -461,20 +790,171 @@ class DocumentExtractor:
                 ]
             }
         ]
-        
+
+    def _cache_key(self, img_str: str) -> str:
+        """Cache key covering the page content, model and detail level."""
+        digest = hashlib.blake2b(img_str.encode("ascii"), digest_size=16)
+        digest.update(f"{self.model}:{self.detail_level}".encode())
+        return digest.hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Return a cached raw response, or None on miss."""
+        if not self.cache_enabled:
+            return None
+        try:
+            return (self._cache_dir / f"{key}.json").read_text()
+        except OSError:
+            return None
+
+    def _cache_put(self, key: str, content: str) -> None:
+        """Store a raw response in the on-disk cache (best effort)."""
+        if not self.cache_enabled:
+            return
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            (self._cache_dir / f"{key}.json").write_text(content)
+        except OSError as e:
+            logger.debug(f"Failed to write vision cache entry: {e}")
+
+    def _extract_with_openai(self, image: Image.Image) -> List[Entity]:
+        """Extract entities using OpenAI's vision models."""
+        img_str = self._encode_image_jpeg(image)
+
+        # Identical pages (common in reruns and duplicated invoices) skip
+        # the API call entirely
+        key = self._cache_key(img_str)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return self._parse_response(cached)
+
         # Call API with JSON response format
-        response = openai.chat.completions.create(
+        response = self._client.chat.completions.create(
             model="gpt-4o-mini",
-            messages=messages,
+            messages=self._build_vision_messages(img_str),
             max_tokens=2000,
             temperature=0.1,
             response_format={"type": "json_object"}
         )
-        
+
         # Parse response
         content = response.choices[0].message.content
+        self._cache_put(key, content)
         return self._parse_response(content)
-    
+
+    def _get_async_client(self):
+        """Return the pooled async OpenAI client for the running loop.
+
+        Keep-alive connections are bound to the event loop that opened
+        them, and each extract_from_pdf call runs under its own
+        asyncio.run() loop, so a client reused across loops fails with
+        "Event loop is closed". The client is therefore cached per
+        running loop and rebuilt whenever the loop changes.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            import openai
+            self._async_client = openai.AsyncOpenAI(
+                api_key=openai.api_key,
+                http_client=self._pooled_http_client(httpx.AsyncClient) if HTTPX_AVAILABLE else None
+            )
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def _extract_with_openai_async(self, image: Image.Image) -> List[Entity]:
+        """Async variant of _extract_with_openai for concurrent page calls."""
+        return await self._extract_encoded_async(self._encode_image_jpeg(image))
+
+    async def _extract_encoded_async(self, img_str: str) -> List[Entity]:
+        """Extract entities from one already-encoded page image."""
+        key = self._cache_key(img_str)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return self._parse_response(cached)
+
+        client = self._get_async_client()
+        response = await client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=self._build_vision_messages(img_str),
+            max_tokens=2000,
+            temperature=0.1,
+            response_format={"type": "json_object"}
+        )
+
+        content = response.choices[0].message.content
+        self._cache_put(key, content)
+        return self._parse_response(content)
+
+    def _build_batch_vision_messages(self, img_strs: List[str]) -> List[Dict[str, Any]]:
+        """Build chat messages packing several page images into one request."""
+        content: List[Dict[str, Any]] = [
+            {
+                "type": "text",
+                "text": (
+                    f"{_USER_SCHEMA_PROMPT}\n\n"
+                    f"You are given {len(img_strs)} document pages. Analyze each page "
+                    "independently and return a single JSON object of the form "
+                    '{"pages": [<page 1 result>, <page 2 result>, ...]}, where each '
+                    "page result uses the schema above and appears in page order."
+                )
+            }
+        ]
+        for i, img_str in enumerate(img_strs):
+            content.append({"type": "text", "text": f"--- PAGE {i + 1} ---"})
+            content.append({
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:image/jpeg;base64,{img_str}",
+                    "detail": self.detail_level
+                }
+            })
+        return [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": content}
+        ]
+
+    async def _extract_batch_with_openai_async(self, images: List[Image.Image]) -> List[Entity]:
+        """Extract entities from several pages with a single vision request."""
+        return await self._extract_batch_encoded_async(
+            [self._encode_image_jpeg(image) for image in images]
+        )
+
+    async def _extract_batch_encoded_async(self, img_strs: List[str]) -> List[Entity]:
+        """Extract entities from several already-encoded pages in one request."""
+        key = self._cache_key("".join(img_strs))
+        cached = self._cache_get(key)
+        if cached is not None:
+            content = cached
+        else:
+            client = self._get_async_client()
+            response = await client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=self._build_batch_vision_messages(img_strs),
+                max_tokens=2000 * len(img_strs),
+                temperature=0.1,
+                response_format={"type": "json_object"}
+            )
+            content = response.choices[0].message.content
+            self._cache_put(key, content)
+
+        try:
+            data = _loads_response(content)
+        except ValueError as e:
+            logger.error(f"Failed to parse batched LLM response: {e}")
+            logger.debug(f"Response content: {content}")
+            return []
+
+        entities = []
+        # Some models ignore the wrapper and return a single page object;
+        # treat that as a one-page batch rather than dropping the result
+        if not isinstance(data, dict):
+            logger.error("Batched LLM response has an unexpected shape; skipping")
+            return []
+        pages = data.get("pages") if isinstance(data.get("pages"), list) else [data]
+        for page_data in pages:
+            if _response_shape_ok(page_data):
+                entities.extend(self._entities_from_data(page_data))
+        return entities
+
     def _parse_response(self, response_content: str) -> List[Entity]:
         """
         Parse LLM response into structured entities.
@@ -485,158 +965,173 @@ class DocumentExtractor:
         Returns:
             List of structured entities
         """
+        if IJSON_AVAILABLE and len(response_content) >= _STREAM_PARSE_THRESHOLD:
+            return self._entities_from_stream(response_content)
         try:
-            data = json.loads(response_content)
-            entities = []
-            
-            # Process companies
-            for company_data in data.get("companies", []):
-                address_data = company_data.get("address", {})
-                contact_data = company_data.get("contact", {})
-                identifiers_data = company_data.get("identifiers", {})
-                
-                company = CompanyEntity(
-                    name=company_data.get("name"),
-                    type=EntityType.COMPANY,
-                    industry=company_data.get("industry"),
-                    address=Address(
-                        street=address_data.get("street"),
-                        city=address_data.get("city"),
-                        state=address_data.get("state"),
-                        postal_code=address_data.get("postal_code"),
-                        country=address_data.get("country")
-                    ),
-                    contact=ContactInfo(
-                        phone=contact_data.get("phone"),
-                        email=contact_data.get("email"),
-                        fax=contact_data.get("fax"),
-                        website=contact_data.get("website")
-                    ),
-                    identifiers={
-                        "mc_number": identifiers_data.get("mc_number"),
-                        "dot_number": identifiers_data.get("dot_number"),
-                        "scac": identifiers_data.get("scac")
-                    }
-                )
-                entities.append(company)
-            
-            # Process people
-            for person_data in data.get("people", []):
-                contact_data = person_data.get("contact", {})
-                person = PersonEntity(
-                    name=person_data.get("name"),
-                    type=EntityType.PERSON,
-                    title=person_data.get("title"),
-                    organization=person_data.get("organization"),
-                    contact=ContactInfo(
-                        phone=contact_data.get("phone"),
-                        email=contact_data.get("email")
-                    )
-                )
-                entities.append(person)
-            
-            # Process shipment data - create LocationEntity objects for origin and destination
-            shipment_data = data.get("shipment", {})
-            locations_data = shipment_data.get("locations", {})
-            
-            origin_location = None
-            destination_location = None
-            
-            for location_type in ["origin", "destination"]:
-                location_data = locations_data.get(location_type, {})
-                if location_data and location_data.get("name"):
-                    address_data = location_data.get("address", {})
-                    location = LocationEntity(
-                        name=location_data.get("name"),
-                        type=EntityType.LOCATION,
-                        location_type=location_type,
-                        address=Address(
-                            street=address_data.get("street"),
-                            city=address_data.get("city"),
-                            state=address_data.get("state"),
-                            postal_code=address_data.get("postal_code"),
-                            country=address_data.get("country")
-                        )
-                    )
-                    entities.append(location)
-                    
-                    if location_type == "origin":
-                        origin_location = location.name
-                    else:
-                        destination_location = location.name
-            
-            # Create a shipment entity if we have reference numbers or dates
-            reference_data = shipment_data.get("reference_numbers", {})
-            dates_data = shipment_data.get("dates", {})
-            cargo_data = shipment_data.get("cargo", {})
-            financial_data = shipment_data.get("financial", {})
-            
-            # Only create a shipment if we have meaningful data
-            if reference_data or dates_data or cargo_data or financial_data:
-                # Identify carrier, shipper, consignee from companies
-                carrier_name = None
-                shipper_name = None
-                consignee_name = None
-                
-                for company in entities:
-                    if isinstance(company, CompanyEntity):
-                        company_type = company.attributes.get("company_type", "").lower()
-                        if "type" in company_data and isinstance(company_data["type"], str):
-                            company_type = company_data["type"].lower()
-                            
-                        if company_type == "carrier":
-                            carrier_name = company.name
-                        elif company_type == "shipper":
-                            shipper_name = company.name
-                        elif company_type == "consignee":
-                            consignee_name = company.name
-                
-                # Create the shipment entity
-                shipment = ShipmentEntity(
-                    name=f"Shipment {reference_data.get('bol_number') or reference_data.get('order_number') or 'Unknown'}",
-                    type=EntityType.SHIPMENT,
-                    reference_numbers=ReferenceNumbers(
-                        order_number=reference_data.get("order_number"),
-                        bol_number=reference_data.get("bol_number"),
-                        tracking_number=reference_data.get("tracking_number"),
-                        pro_number=reference_data.get("pro_number"),
-                        load_number=reference_data.get("load_number"),
-                        carrier_reference=reference_data.get("carrier_reference")
-                    ),
-                    dates=ShipmentDates(
-                        pickup=dates_data.get("pickup"),
-                        delivery=dates_data.get("delivery"),
-                        created=dates_data.get("created"),
-                        estimated_delivery=dates_data.get("estimated_delivery")
-                    ),
-                    origin=origin_location,
-                    destination=destination_location,
-                    carrier=carrier_name,
-                    shipper=shipper_name,
-                    consignee=consignee_name,
-                    cargo=CargoDetails(
-                        description=cargo_data.get("description"),
-                        quantity=cargo_data.get("quantity"),
-                        weight=cargo_data.get("weight"),
-                        dimensions=cargo_data.get("dimensions"),
-                        hazardous=cargo_data.get("hazardous", False),
-                        special_instructions=cargo_data.get("special_instructions")
-                    ),
-                    financial=FinancialDetails(
-                        total_charges=financial_data.get("total_charges"),
-                        line_haul=financial_data.get("line_haul"),
-                        fuel_surcharge=financial_data.get("fuel_surcharge"),
-                        additional_charges=financial_data.get("additional_charges", {}),
-                        payment_terms=financial_data.get("payment_terms"),
-                        currency=financial_data.get("currency")
-                    ),
-                    status=shipment_data.get("status"),
-                    document_type=shipment_data.get("document_type")
-                )
-                entities.append(shipment)
-            
-            return entities
-        except json.JSONDecodeError as e:
+            data = _loads_response(response_content)
+        except ValueError as e:
             logger.error(f"Failed to parse LLM response: {e}")
             logger.debug(f"Response content: {response_content}")
             return []
+        if not _response_shape_ok(data):
+            logger.error("LLM response has an unexpected shape; skipping")
+            logger.debug(f"Response content: {response_content}")
+            return []
+        return self._entities_from_data(data)
+
+    def _company_entity(self, company_data: Dict[str, Any]) -> CompanyEntity:
+        """Construct a company entity from one decoded company record."""
+        identifiers_data = company_data.get("identifiers", {})
+
+        return CompanyEntity(
+            name=company_data.get("name"),
+            type=EntityType.COMPANY,
+            industry=company_data.get("industry"),
+            address=_addr(company_data.get("address")),
+            contact=_contact(company_data.get("contact")),
+            identifiers={
+                "mc_number": identifiers_data.get("mc_number"),
+                "dot_number": identifiers_data.get("dot_number"),
+                "scac": identifiers_data.get("scac")
+            }
+        )
+
+    def _person_entity(self, person_data: Dict[str, Any]) -> PersonEntity:
+        """Construct a person entity from one decoded person record."""
+        return PersonEntity(
+            name=person_data.get("name"),
+            type=EntityType.PERSON,
+            title=person_data.get("title"),
+            organization=person_data.get("organization"),
+            contact=_contact(person_data.get("contact"))
+        )
+
+    def _entities_from_stream(self, response_content: str) -> List[Entity]:
+        """
+        Incrementally parse a large response with ijson.
+
+        Companies and people are constructed as each array item completes
+        instead of materializing the whole payload as one dict first, which
+        keeps peak memory flat for multi-company shipment documents.
+        """
+        buf = BytesIO(response_content.encode("utf-8"))
+        entities: List[Entity] = []
+        try:
+            for company_data in ijson.items(buf, "companies.item"):
+                entities.append(self._company_entity(company_data))
+            buf.seek(0)
+            for person_data in ijson.items(buf, "people.item"):
+                entities.append(self._person_entity(person_data))
+            buf.seek(0)
+            shipment_data = next(ijson.items(buf, "shipment"), None)
+        except ijson.JSONError as e:
+            logger.error(f"Failed to stream-parse LLM response: {e}")
+            return entities
+        if shipment_data:
+            entities.extend(self._entities_from_data({"shipment": shipment_data}))
+        return entities
+
+    def _entities_from_data(self, data: Dict[str, Any]) -> List[Entity]:
+        """Construct entity objects from a decoded response payload."""
+        # Noisy or refused responses often decode to {} or an error dict;
+        # bail before running the section loops and shipment construction
+        shipment_data = data.get("shipment") or {}
+        if not (data.get("companies") or data.get("people") or shipment_data):
+            return []
+
+        entities = []
+
+        # Process companies, recording each declared role as we go so the
+        # shipment block below doesn't have to rescan the entities
+        company_roles: Dict[str, str] = {}
+        for company_data in data.get("companies", []):
+            company = self._company_entity(company_data)
+            entities.append(company)
+            role = company_data.get("type")
+            if isinstance(role, str) and company.name:
+                company_roles.setdefault(role.lower(), company.name)
+
+        # Process people
+        for person_data in data.get("people", []):
+            entities.append(self._person_entity(person_data))
+
+        # Process shipment data - create LocationEntity objects for origin and destination
+        locations_data = shipment_data.get("locations", {})
+        
+        origin_location = None
+        destination_location = None
+        
+        for location_type in ["origin", "destination"]:
+            location_data = locations_data.get(location_type, {})
+            if location_data and location_data.get("name"):
+                location = LocationEntity(
+                    name=location_data.get("name"),
+                    type=EntityType.LOCATION,
+                    location_type=location_type,
+                    address=_addr(location_data.get("address"))
+                )
+                entities.append(location)
+                
+                if location_type == "origin":
+                    origin_location = location.name
+                else:
+                    destination_location = location.name
+        
+        # Create a shipment entity if we have reference numbers or dates
+        reference_data = shipment_data.get("reference_numbers", {})
+        dates_data = shipment_data.get("dates", {})
+        cargo_data = shipment_data.get("cargo", {})
+        financial_data = shipment_data.get("financial", {})
+        
+        # Only create a shipment if we have meaningful data
+        if reference_data or dates_data or cargo_data or financial_data:
+            # Carrier/shipper/consignee were recorded during the company loop
+            carrier_name = company_roles.get("carrier")
+            shipper_name = company_roles.get("shipper")
+            consignee_name = company_roles.get("consignee")
+
+            # Create the shipment entity
+            shipment = ShipmentEntity(
+                name=f"Shipment {reference_data.get('bol_number') or reference_data.get('order_number') or 'Unknown'}",
+                type=EntityType.SHIPMENT,
+                reference_numbers=ReferenceNumbers(
+                    order_number=reference_data.get("order_number"),
+                    bol_number=reference_data.get("bol_number"),
+                    tracking_number=reference_data.get("tracking_number"),
+                    pro_number=reference_data.get("pro_number"),
+                    load_number=reference_data.get("load_number"),
+                    carrier_reference=reference_data.get("carrier_reference")
+                ),
+                dates=ShipmentDates(
+                    pickup=dates_data.get("pickup"),
+                    delivery=dates_data.get("delivery"),
+                    created=dates_data.get("created"),
+                    estimated_delivery=dates_data.get("estimated_delivery")
+                ),
+                origin=origin_location,
+                destination=destination_location,
+                carrier=carrier_name,
+                shipper=shipper_name,
+                consignee=consignee_name,
+                cargo=CargoDetails(
+                    description=cargo_data.get("description"),
+                    quantity=cargo_data.get("quantity"),
+                    weight=cargo_data.get("weight"),
+                    dimensions=cargo_data.get("dimensions"),
+                    hazardous=cargo_data.get("hazardous", False),
+                    special_instructions=cargo_data.get("special_instructions")
+                ),
+                financial=FinancialDetails(
+                    total_charges=financial_data.get("total_charges"),
+                    line_haul=financial_data.get("line_haul"),
+                    fuel_surcharge=financial_data.get("fuel_surcharge"),
+                    additional_charges=financial_data.get("additional_charges", {}),
+                    payment_terms=financial_data.get("payment_terms"),
+                    currency=financial_data.get("currency")
+                ),
+                status=shipment_data.get("status"),
+                document_type=shipment_data.get("document_type")
+            )
+            entities.append(shipment)
+        
+        return entities
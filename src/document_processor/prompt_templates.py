@@ -5,28 +5,25 @@ This module provides specialized prompts for different document types to improve
 entity extraction results from vision-enabled LLMs.
 """
 
+import functools
 import json
 from typing import Dict, Any, List, Optional
 
-# Base extraction prompt that uses chain-of-thought reasoning
+# Base extraction prompt, kept terse: every byte here is paid on each
+# request, so overlapping instructions are collapsed into one step list
 BASE_EXTRACTION_PROMPT = """
-I need to extract structured information from this document for entity mapping. 
-
-Let's think step by step:
-1. First, identify what type of document this is based on layout and content
-2. Note all company names, including variations and abbreviations used within the document
-3. For each company, extract all available information like address, contact details, roles
-4. Pay special attention to any indications of company name changes, acquisitions, or parent/subsidiary relationships
-5. Also extract named people with their titles and affiliated organizations
-6. For shipping documents, identify locations, dates, and shipment details
-
-IMPORTANT: Look carefully for any indications that a company might have changed names, been acquired, 
-or have a parent-subsidiary relationship. These relationships might be indicated by phrases like:
-- "formerly known as"
-- "a division of"
-- "a subsidiary of"
-- "dba" (doing business as)
-- Different names used for the same entity in different sections
+Extract structured information from this document for entity mapping.
+
+Steps:
+1) Identify the document type from layout and content
+2) List every company name, including variations and abbreviations
+3) For each company, capture address, contact details and role
+4) Capture named people with titles and affiliated organizations
+5) For shipping documents, capture locations, dates and shipment details
+
+Watch for name changes, acquisitions and parent/subsidiary links, signalled
+by "formerly known as", "a division of", "a subsidiary of", "dba", or
+different names used for the same entity in different sections.
 
 Extract ALL entities as structured data in the exact format specified below.
 """
@@ -34,45 +31,29 @@ Extract ALL entities as structured data in the exact format specified below.
 # Document-specific prompt additions
 DOCUMENT_TYPE_PROMPTS = {
     "invoice": """
-    This appears to be an invoice document. In addition to the standard company and person entities, look for:
-    - Invoice number, date, and payment terms
-    - Billing and shipping addresses (these may refer to different company locations)
-    - Line items with descriptions, quantities, and prices
-    - Total amount and currency
-    - Reference numbers (PO numbers, BOL numbers, etc.)
-    - Any notes or special instructions that might indicate business relationships
+    This is an invoice. Also capture: invoice number, date, payment terms;
+    billing vs shipping addresses; line items with quantities and prices;
+    total amount and currency; reference numbers (PO, BOL); notes hinting
+    at business relationships.
     """,
-    
+
     "bill_of_lading": """
-    This appears to be a Bill of Lading (BOL). In addition to standard entities, pay special attention to:
-    - Shipper information (the company sending the shipment)
-    - Carrier information (the transportation company)
-    - Consignee information (the company receiving the shipment)
-    - Origin and destination addresses
-    - BOL number and date
-    - Description of goods, weight, and package count
-    - Special instructions or routing information
+    This is a Bill of Lading. Also capture: shipper, carrier and consignee;
+    origin and destination addresses; BOL number and date; goods
+    description, weight and package count; routing or special instructions.
     """,
-    
+
     "rate_confirmation": """
-    This appears to be a Rate Confirmation Sheet. In addition to standard entities, focus on:
-    - Broker/logistics company information
-    - Carrier information (the transportation company)
-    - Shipper and consignee information
-    - Origin and destination addresses
-    - Load details (weight, dimensions, number of pallets)
-    - Rate information and additional charges
-    - Special instructions or requirements
+    This is a Rate Confirmation Sheet. Also capture: broker/logistics
+    company; carrier; shipper and consignee; origin and destination
+    addresses; load details (weight, dimensions, pallets); rate and
+    additional charges; special requirements.
     """,
-    
+
     "proof_of_delivery": """
-    This appears to be a Proof of Delivery (POD). In addition to standard entities, look for:
-    - Delivery confirmation details (date, time, signature)
-    - Shipper and receiver information
-    - Carrier information
-    - Item details and quantities received
-    - Any discrepancies or damages noted
-    - Reference numbers connecting to other documents
+    This is a Proof of Delivery. Also capture: delivery confirmation (date,
+    time, signature); shipper and receiver; carrier; items and quantities
+    received; noted discrepancies or damages; linking reference numbers.
     """
 }
 
@@ -271,67 +252,112 @@ FEW_SHOT_EXAMPLES = {
     ]
 }
 
+# Serialized once at import: the schema and few-shot payloads are static,
+# so prompt generation never re-runs json.dumps on them. Compact
+# separators drop the ~40% of bytes indent=2 spends on whitespace the
+# model does not need, cutting prompt tokens on every request.
+_SCHEMA_JSON = json.dumps(ENTITY_SCHEMA_EXAMPLES, separators=(',', ':'))
+_FEW_SHOT_JSON = {
+    doc_type: [
+        (example["document_description"], json.dumps(example["entities"], separators=(',', ':')))
+        for example in examples
+    ]
+    for doc_type, examples in FEW_SHOT_EXAMPLES.items()
+}
+
+
+_FINAL_INSTRUCTION = "\n\nNow, extract all entities from the provided document, following the format above."
+
+
+@functools.lru_cache(maxsize=16)
 def generate_extraction_prompt(document_type: str = None, include_examples: bool = True) -> str:
     """
     Generate a specialized prompt for document extraction based on document type.
-    
+
+    The output is deterministic for a handful of (document_type,
+    include_examples) combinations, so results are memoized and repeat
+    calls return the cached string.
+
     Args:
         document_type: Type of document (invoice, bill_of_lading, rate_confirmation, proof_of_delivery)
         include_examples: Whether to include few-shot examples
-        
+
     Returns:
         Complete extraction prompt
     """
-    prompt = BASE_EXTRACTION_PROMPT
-    
+    # Collect segments and join once; += on a multi-KB prompt copies the
+    # whole accumulated string for every append
+    parts = [BASE_EXTRACTION_PROMPT]
+
     # Add document-specific guidance if available
     if document_type and document_type in DOCUMENT_TYPE_PROMPTS:
-        prompt += DOCUMENT_TYPE_PROMPTS[document_type]
-    
-    # Add schema information
-    prompt += "\n\nExtract the data in the following JSON schema format:\n"
-    prompt += json.dumps(ENTITY_SCHEMA_EXAMPLES, indent=2)
-    
+        parts.append(DOCUMENT_TYPE_PROMPTS[document_type])
+
+    # Add schema information (pre-serialized at import)
+    parts.append("\n\nExtract the data in the following JSON schema format:\n")
+    parts.append(_SCHEMA_JSON)
+
     # Add few-shot examples if requested
-    if include_examples and document_type and document_type in FEW_SHOT_EXAMPLES:
-        examples = FEW_SHOT_EXAMPLES[document_type]
-        prompt += "\n\nHere are some examples of the expected output:\n"
-        
-        for example in examples:
-            prompt += f"\nDocument description: {example['document_description']}\n"
-            prompt += f"Extracted entities:\n{json.dumps(example['entities'], indent=2)}\n"
-    
+    if include_examples and document_type and document_type in _FEW_SHOT_JSON:
+        parts.append("\n\nHere are some examples of the expected output:\n")
+
+        for description, entities_json in _FEW_SHOT_JSON[document_type]:
+            parts.append(f"\nDocument description: {description}\n")
+            parts.append(f"Extracted entities:\n{entities_json}\n")
+
     # Add final instruction
-    prompt += "\n\nNow, extract all entities from the provided document, following the format above."
-    
-    return prompt
+    parts.append(_FINAL_INSTRUCTION)
 
-def generate_document_classification_prompt() -> str:
+    return "".join(parts)
+
+
+def generate_extraction_prompt_blocks(document_type: str = None, include_examples: bool = True) -> List[Dict[str, Any]]:
     """
-    Generate a prompt for document type classification.
-    
+    Return the extraction prompt as provider-ready content blocks.
+
+    The instructions, schema and few-shot examples are identical for every
+    call with the same arguments, so they form one leading block tagged
+    with Anthropic's ephemeral cache_control marker; providers that cache
+    prompt prefixes automatically (OpenAI) simply ignore the marker. Only
+    the short final instruction sits in the uncached trailing block.
+
+    Args:
+        document_type: Type of document (invoice, bill_of_lading, rate_confirmation, proof_of_delivery)
+        include_examples: Whether to include few-shot examples
+
     Returns:
-        Document classification prompt
+        List of text content blocks with the static prefix marked cacheable
     """
-    return """
+    full_prompt = generate_extraction_prompt(document_type, include_examples)
+    static_prefix = full_prompt[:-len(_FINAL_INSTRUCTION)]
+    return [
+        {"type": "text", "text": static_prefix, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": _FINAL_INSTRUCTION},
+    ]
+
+# The classification and name-change prompts take no arguments, so they are
+# plain module constants; the generator functions stay for API compatibility
+_CLASSIFICATION_PROMPT = """
     Analyze this document and classify it into one of the following categories:
     - invoice
     - bill_of_lading
     - rate_confirmation
     - proof_of_delivery
     - other
-    
+
     Return ONLY the category name (lowercase) and nothing else.
     """
 
-def generate_name_change_detection_prompt() -> str:
+def generate_document_classification_prompt() -> str:
     """
-    Generate a prompt specifically for detecting company name changes.
-    
+    Generate a prompt for document type classification.
+
     Returns:
-        Name change detection prompt
+        Document classification prompt
     """
-    return """
+    return _CLASSIFICATION_PROMPT
+
+_NAME_CHANGE_PROMPT = """
     Analyze this document and identify any evidence of company name changes, acquisitions, 
     mergers, or parent-subsidiary relationships.
     
@@ -352,4 +378,13 @@ def generate_name_change_detection_prompt() -> str:
     Format the response as a JSON array of objects with these fields.
     
     If no name changes or relationships are detected, return an empty array [].
-    """ 
\ No newline at end of file
+    """
+
+def generate_name_change_detection_prompt() -> str:
+    """
+    Generate a prompt specifically for detecting company name changes.
+
+    Returns:
+        Name change detection prompt
+    """
+    return _NAME_CHANGE_PROMPT
\ No newline at end of file
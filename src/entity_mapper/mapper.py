@@ -2,19 +2,75 @@
 Entity mapper module for matching extracted entities with database records.
 """
 
+import functools
 import os
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple, Union
 from pathlib import Path
 
-from rapidfuzz import fuzz, process
+from rapidfuzz import process
+from rapidfuzz.distance import Levenshtein
 from pydantic import BaseModel
 
 from .schema import Entity, CompanyEntity, NameChange, MappingResult
 
 logger = logging.getLogger(__name__)
 
+# Databases below this many fuzzy choices keep the batched linear scan;
+# a BK-tree only pays for itself once the candidate set is large
+_BKTREE_MIN_CHOICES = 512
+
+
+class _BKTree:
+    """
+    Minimal BK-tree over strings keyed by Levenshtein distance.
+
+    A query with edit radius r only descends into children whose distance
+    band can still contain a match, so lookups visit a small fraction of
+    the nodes instead of scanning every name. Nodes are plain lists
+    (term, payloads, children-by-distance) to keep construction cheap.
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self):
+        self._root = None
+
+    def add(self, term: str, payload: Any) -> None:
+        if self._root is None:
+            self._root = [term, [payload], {}]
+            return
+        node = self._root
+        while True:
+            dist = Levenshtein.distance(term, node[0])
+            if dist == 0:
+                node[1].append(payload)
+                return
+            child = node[2].get(dist)
+            if child is None:
+                node[2][dist] = [term, [payload], {}]
+                return
+            node = child
+
+    def find(self, term: str, max_edits: int) -> List[Tuple[int, str, List[Any]]]:
+        """Return (distance, term, payloads) for every node within max_edits."""
+        results = []
+        if self._root is None:
+            return results
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            dist = Levenshtein.distance(term, node[0])
+            if dist <= max_edits:
+                results.append((dist, node[0], node[1]))
+            low, high = dist - max_edits, dist + max_edits
+            for child_dist, child in node[2].items():
+                if low <= child_dist <= high:
+                    stack.append(child)
+        return results
+
 class EntityDatabase:
     """Mock database of entities for the hackathon."""
     
@@ -27,7 +83,8 @@ class EntityDatabase:
         """
         self.entities = []
         self.name_changes = []
-        
+        self.embeddings = None
+
         # Load database if path provided
         if db_path:
             self.load_from_file(db_path)
@@ -36,12 +93,24 @@ class EntityDatabase:
             self._create_mock_data()
     
     def load_from_file(self, file_path: Union[str, Path]) -> None:
-        """Load entity database from a JSON file."""
+        """
+        Load entity database from a JSON file.
+
+        If a sidecar ``.npy`` file with precomputed entity embeddings exists
+        next to the JSON (same stem), it is memory-mapped rather than read
+        into the heap, so forked workers share one page-cache-backed copy.
+        """
         try:
             with open(file_path, 'r') as f:
                 data = json.load(f)
                 self.entities = data.get('entities', [])
                 self.name_changes = data.get('name_changes', [])
+            embeddings_path = Path(file_path).with_suffix('.npy')
+            if embeddings_path.exists():
+                import numpy as np
+                self.embeddings = np.load(embeddings_path, mmap_mode='r')
+                logger.info(f"Memory-mapped entity embeddings from {embeddings_path}")
+            self._build_indexes()
         except Exception as e:
             logger.error(f"Failed to load database: {e}")
             # Fall back to mock data
@@ -167,98 +236,203 @@ class EntityDatabase:
                 "change_reason": "restructuring"
             }
         ]
-    
+
+        self._build_indexes()
+
+    def _build_indexes(self) -> None:
+        """
+        Build lowercase lookup indexes over the loaded entities.
+
+        search_by_name runs once per extracted entity, and recomputing
+        the folded form of every name and alias on each call made the exact
+        phase an O(N) scan. These dicts are built once per load so exact
+        name, alias and previous-name hits become single probes.
+        """
+        self._by_id: Dict[str, Dict] = {entity["id"]: entity for entity in self.entities}
+        self._search_cache: Dict[Tuple[str, float], List[Dict]] = {}
+
+        # One combined exact index covering names, aliases and previous
+        # names: each bucket holds (direct entities, name-change hits) so
+        # exact dispatch is a single probe regardless of which kind of
+        # string matched. Direct hits shadow name-change hits for the
+        # same string, as in the original two-pass scan.
+        self._exact_index: Dict[str, Tuple[List[Dict], List[Tuple[Dict, Dict]]]] = {}
+
+        for entity in self.entities:
+            # Collect each entity's keys as a set first so an alias that
+            # equals the name does not list the entity twice
+            keys = {entity["name"].casefold()}
+            keys.update(alias.casefold() for alias in entity.get("aliases", []))
+            for key in keys:
+                self._exact_index.setdefault(key, ([], []))[0].append(entity)
+
+        for change in self.name_changes:
+            entity = self._by_id.get(change["entity_id"])
+            if entity is not None:
+                key = change["previous_name"].casefold()
+                self._exact_index.setdefault(key, ([], []))[1].append((entity, change))
+
+        # Flattened candidate arrays for the fuzzy pass: process.extract
+        # scores a whole list inside rapidfuzz's C extension, so names and
+        # aliases are laid out once here instead of paying one Python-level
+        # scorer call per entry on every query
+        self._fuzzy_choices: List[str] = []
+        self._choice_entities: List[Dict] = []
+        for entity in self.entities:
+            self._fuzzy_choices.append(entity["name"].casefold())
+            self._choice_entities.append(entity)
+            for alias in entity.get("aliases", []):
+                self._fuzzy_choices.append(alias.casefold())
+                self._choice_entities.append(entity)
+
+        self._prev_choices: List[str] = [
+            change["previous_name"].casefold() for change in self.name_changes
+        ]
+
+        # For large databases, index every choice in a BK-tree so the
+        # fuzzy pass visits only candidates within edit range instead of
+        # scoring the whole array
+        self._bktree: Optional[_BKTree] = None
+        if len(self._fuzzy_choices) + len(self._prev_choices) >= _BKTREE_MIN_CHOICES:
+            tree = _BKTree()
+            for choice, entity in zip(self._fuzzy_choices, self._choice_entities):
+                tree.add(choice, ("entity", entity))
+            for choice, change in zip(self._prev_choices, self.name_changes):
+                tree.add(choice, ("change", change))
+            self._bktree = tree
+
     def search_by_name(self, name: str, threshold: float = 0.8) -> List[Dict]:
         """
         Search for entities by name with fuzzy matching.
-        
+
+        Documents repeat the same company name across pages and line
+        items, so results are memoized per (lowercased name, threshold).
+        The cache is dropped whenever the indexes are rebuilt.
+
         Args:
             name: Name to search for
             threshold: Similarity threshold (0-1)
-            
+
         Returns:
             List of matching entities
         """
+        name_lower = name.casefold()
+        cache_key = (name_lower, threshold)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            # Shallow copy so callers can reorder/trim without touching
+            # the cached list
+            return list(cached)
+
+        results = self._search_by_name_uncached(name_lower, threshold)
+        if len(self._search_cache) >= 4096:
+            self._search_cache.clear()
+        self._search_cache[cache_key] = results
+        return list(results)
+
+    def _search_by_name_uncached(self, name_lower: str, threshold: float) -> List[Dict]:
+        # Exact dispatch (names, aliases and previous names) is a single
+        # probe of the combined index; the exact path builds its result
+        # list directly and returns without any scratch allocations
+        bucket = self._exact_index.get(name_lower)
+        if bucket is not None:
+            direct_matches, change_hits = bucket
+            if direct_matches:
+                return [
+                    {"entity": entity, "score": 1.0, "name_change": None}
+                    for entity in direct_matches
+                ]
+            if change_hits:
+                return [
+                    {"entity": entity, "score": 1.0, "name_change": change}
+                    for entity, change in change_hits
+                ]
+
         results = []
-        
-        # Check direct matches with current names
-        direct_matches = []
-        for entity in self.entities:
-            # Check exact match
-            if entity["name"].lower() == name.lower():
-                direct_matches.append((entity, 1.0))
-                continue
-                
-            # Check aliases
-            for alias in entity.get("aliases", []):
-                if alias.lower() == name.lower():
-                    direct_matches.append((entity, 1.0))
-                    break
-        
-        # Add direct matches to results
-        for entity, score in direct_matches:
-            results.append({
-                "entity": entity,
-                "score": score,
-                "name_change": None
-            })
-        
-        # If we have direct matches, return them
-        if direct_matches:
-            return results
-        
-        # Check for name changes
-        for change in self.name_changes:
-            if change["previous_name"].lower() == name.lower():
-                # Find the current entity
-                for entity in self.entities:
-                    if entity["id"] == change["entity_id"]:
-                        results.append({
-                            "entity": entity,
-                            "score": 1.0,
-                            "name_change": change
-                        })
-                        break
-        
-        # If we have exact name change matches, return them
-        if results:
+
+        # On large databases, walk the BK-tree instead of scoring every
+        # choice: only candidates within the edit radius implied by the
+        # threshold are visited. Acceptance below is
+        # dist <= (1-t) * max(len(term), len(query)), and a term can be
+        # up to dist longer than the query, so the radius must cover
+        # dist <= (1-t) * (len(query) + dist), i.e. (1-t)/t * len(query);
+        # the per-result score filter then drops anything over-fetched.
+        if self._bktree is not None:
+            max_edits = int((1 - threshold) / max(threshold, 0.01) * len(name_lower))
+            best_by_entity: Dict[int, Dict] = {}
+            for dist, term, payloads in self._bktree.find(name_lower, max_edits):
+                score = 1.0 - dist / max(len(term), len(name_lower), 1)
+                if score < threshold:
+                    continue
+                for kind, payload in payloads:
+                    if kind == "entity":
+                        previous = best_by_entity.get(id(payload))
+                        if previous is None:
+                            best_by_entity[id(payload)] = {
+                                "entity": payload,
+                                "score": score,
+                                "name_change": None
+                            }
+                        elif score > previous["score"]:
+                            previous["score"] = score
+                    else:
+                        entity = self._by_id.get(payload["entity_id"])
+                        if entity is not None:
+                            results.append({
+                                "entity": entity,
+                                "score": score,
+                                "name_change": payload
+                            })
+            results.extend(best_by_entity.values())
+            results.sort(key=lambda x: x["score"], reverse=True)
             return results
-        
-        # Perform fuzzy matching on current names
-        for entity in self.entities:
-            score = fuzz.ratio(entity["name"].lower(), name.lower()) / 100
-            if score >= threshold:
-                results.append({
+
+        # Fuzzy match current names and aliases with one batched C call
+        # over the prebuilt choice array, keeping the best score per
+        # entity. Levenshtein.normalized_similarity takes the Myers
+        # bit-parallel path for strings up to 64 chars (which covers
+        # company names), and score_cutoff does double duty: besides
+        # filtering the results, it lets rapidfuzz reject candidates on
+        # length difference alone and run a banded DP on the rest. It
+        # also scores in 0-1 directly, matching the threshold scale and
+        # the BK-tree path above.
+        best_by_entity: Dict[int, Dict] = {}
+        for _, score, idx in process.extract(
+            name_lower,
+            self._fuzzy_choices,
+            scorer=Levenshtein.normalized_similarity,
+            score_cutoff=threshold,
+            limit=None,
+        ):
+            entity = self._choice_entities[idx]
+            previous = best_by_entity.get(id(entity))
+            if previous is None:
+                best_by_entity[id(entity)] = {
                     "entity": entity,
                     "score": score,
                     "name_change": None
+                }
+            elif score > previous["score"]:
+                previous["score"] = score
+        results.extend(best_by_entity.values())
+
+        # Fuzzy match previous names the same way
+        for _, score, idx in process.extract(
+            name_lower,
+            self._prev_choices,
+            scorer=Levenshtein.normalized_similarity,
+            score_cutoff=threshold,
+            limit=None,
+        ):
+            change = self.name_changes[idx]
+            # Look up the current entity by id
+            entity = self._by_id.get(change["entity_id"])
+            if entity is not None:
+                results.append({
+                    "entity": entity,
+                    "score": score,
+                    "name_change": change
                 })
-                continue
-                
-            # Check aliases with fuzzy matching
-            for alias in entity.get("aliases", []):
-                alias_score = fuzz.ratio(alias.lower(), name.lower()) / 100
-                if alias_score > score and alias_score >= threshold:
-                    results.append({
-                        "entity": entity,
-                        "score": alias_score,
-                        "name_change": None
-                    })
-                    break
-        
-        # Perform fuzzy matching on previous names
-        for change in self.name_changes:
-            score = fuzz.ratio(change["previous_name"].lower(), name.lower()) / 100
-            if score >= threshold:
-                # Find the current entity
-                for entity in self.entities:
-                    if entity["id"] == change["entity_id"]:
-                        results.append({
-                            "entity": entity,
-                            "score": score,
-                            "name_change": change
-                        })
-                        break
         
         # Sort results by score (descending)
         results.sort(key=lambda x: x["score"], reverse=True)
@@ -266,6 +440,25 @@ class EntityDatabase:
         return results
 
 
+@functools.lru_cache(maxsize=None)
+def get_entity_database(db_path: Optional[str] = None) -> EntityDatabase:
+    """
+    Return a shared EntityDatabase for the given path.
+
+    Building the database also builds its exact index, fuzzy choice
+    arrays and (for large sets) BK-tree, so callers that process many
+    documents should go through this factory and pay construction once
+    per path rather than per invocation.
+
+    Args:
+        db_path: Optional path to the JSON database file
+
+    Returns:
+        The EntityDatabase instance shared by all callers with this path
+    """
+    return EntityDatabase(db_path)
+
+
 class EntityMapper:
     """Maps extracted entities to database records."""
     
@@ -303,7 +496,15 @@ class EntityMapper:
                 original_entity=entity,
                 confidence=0.0
             )
-        
+
+        # Empty or single-character names are extraction noise; skip the
+        # fuzzy scan they would otherwise trigger
+        if not entity.name or len(entity.name.strip()) < 2:
+            return MappingResult(
+                original_entity=entity,
+                confidence=0.0
+            )
+
         # Search for matches
         matches = self.database.search_by_name(
             entity.name,
@@ -344,17 +545,21 @@ class EntityMapper:
     def map_entities(self, entities: List[Entity]) -> List[MappingResult]:
         """
         Map a list of entities to the database.
-        
+
+        Large batches are mapped on a thread pool: the hot work happens
+        inside rapidfuzz's C extension with the GIL released, and the
+        database indexes are read-only after construction, so the calls
+        are independent. Small batches stay on the plain loop, which is
+        cheaper than spinning up a pool.
+
         Args:
             entities: List of entities to map
-            
+
         Returns:
-            List of MappingResult objects
+            List of MappingResult objects, in input order
         """
-        results = []
-        
-        for entity in entities:
-            result = self.map_entity(entity)
-            results.append(result)
-        
-        return results
+        if len(entities) >= 16:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                return list(executor.map(self.map_entity, entities))
+
+        return [self.map_entity(entity) for entity in entities]
@@ -1,12 +1,13 @@
 #!/usr/bin/env python
 
+import hashlib
 import os
 import sys
-import json
 import logging
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Union
 
+import orjson
 import typer
 from rich.console import Console
 from rich.logging import RichHandler
@@ -17,8 +18,15 @@ from dotenv import load_dotenv
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
 
 from src.document_processor.extractor import DocumentExtractor
-from src.entity_mapper.mapper import EntityMapper, EntityDatabase
-from src.entity_mapper.schema import Entity, MappingResult
+from src.entity_mapper.mapper import EntityMapper, get_entity_database
+from src.entity_mapper.schema import (
+    CompanyEntity,
+    Entity,
+    LocationEntity,
+    MappingResult,
+    PersonEntity,
+    ShipmentEntity,
+)
 from src.utils.visualization import generate_html_visualization
 
 # Set up logging
@@ -83,8 +91,7 @@ def process(
     )
     
     log.info("Initializing entity database and mapper...")
-    db_path = Path(db_path) if db_path else None
-    database = EntityDatabase(db_path)
+    database = get_entity_database(db_path)
     mapper = EntityMapper(
         database=database,
         match_threshold=match_threshold,
@@ -107,6 +114,29 @@ def process(
         raise typer.Exit(code=1)
 
 
+# Concrete classes for rebuilding extraction-cache entries by their
+# "type" discriminator
+_ENTITY_CLASSES = {
+    "company": CompanyEntity,
+    "person": PersonEntity,
+    "location": LocationEntity,
+    "shipment": ShipmentEntity,
+}
+
+
+def _load_cached_entities(cache_file: Path) -> Optional[List[Entity]]:
+    """Rebuild entities from an extraction-cache file, or None if unusable."""
+    try:
+        records = orjson.loads(cache_file.read_bytes())
+        return [
+            _ENTITY_CLASSES.get(record.get("type"), Entity)(**record)
+            for record in records
+        ]
+    except Exception as e:
+        log.debug(f"Ignoring unusable extraction cache {cache_file}: {e}")
+        return None
+
+
 def process_single_document(
     document_path: Path,
     output_dir: Path,
@@ -115,15 +145,36 @@ def process_single_document(
 ) -> None:
     """Process a single document file."""
     log.info(f"Processing document: {document_path}")
-    
-    # Extract entities
-    log.info("Extracting entities...")
-    if document_path.suffix.lower() == '.pdf':
-        entities = extractor.extract_from_pdf(document_path)
-    else:
-        entities = extractor.extract_from_image(document_path)
-    
-    log.info(f"Extracted {len(entities)} entities")
+
+    # Extraction dominates runtime and is deterministic for identical
+    # bytes and extractor settings, so results are memoized on disk by
+    # content hash plus model and detail level (mirroring the
+    # extractor's own _cache_key); rerunning over an unchanged
+    # directory only pays for mapping
+    hasher = hashlib.blake2b(document_path.read_bytes(), digest_size=16)
+    hasher.update(f"{extractor.model}:{extractor.detail_level}".encode())
+    digest = hasher.hexdigest()
+    cache_dir = output_dir / ".extraction_cache"
+    cache_file = cache_dir / f"{digest}.json"
+
+    entities = None
+    if cache_file.exists():
+        entities = _load_cached_entities(cache_file)
+        if entities is not None:
+            log.info(f"Loaded {len(entities)} entities from extraction cache")
+
+    if entities is None:
+        # Extract entities
+        log.info("Extracting entities...")
+        if document_path.suffix.lower() == '.pdf':
+            entities = extractor.extract_from_pdf(document_path)
+        else:
+            entities = extractor.extract_from_image(document_path)
+
+        log.info(f"Extracted {len(entities)} entities")
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        _write_json_array(cache_file, entities)
     
     # Map entities
     log.info("Mapping entities to database...")
@@ -170,6 +221,25 @@ def process_document_directory(
         process_single_document(document_path, output_dir, extractor, mapper)
 
 
+def _write_json_array(path: Path, models: List[Any]) -> None:
+    """
+    Stream a JSON array of pydantic models to disk one element at a time.
+
+    Dumping every model into one big list before encoding doubles peak
+    memory on large documents; writing each element as it is serialized
+    keeps only one dict in flight. model_dump + orjson keep the encoding
+    in native code, and the one-element-per-line layout stays diffable.
+    """
+    with open(path, "wb") as f:
+        f.write(b"[")
+        first = True
+        for model in models:
+            f.write(b"\n" if first else b",\n")
+            f.write(orjson.dumps(model.model_dump()))
+            first = False
+        f.write(b"\n]" if not first else b"]")
+
+
 def save_results(
     document_path: Path,
     output_dir: Path,
@@ -181,17 +251,9 @@ def save_results(
     doc_output_dir = output_dir / document_path.stem
     doc_output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Save extracted entities
-    entities_file = doc_output_dir / "extracted_entities.json"
-    with open(entities_file, "w") as f:
-        entities_data = [entity.dict() for entity in entities]
-        json.dump(entities_data, f, indent=2)
-    
-    # Save mapping results
-    mapping_file = doc_output_dir / "mapping_results.json"
-    with open(mapping_file, "w") as f:
-        mapping_data = [result.dict() for result in mapping_results]
-        json.dump(mapping_data, f, indent=2)
+    # Save extracted entities and mapping results
+    _write_json_array(doc_output_dir / "extracted_entities.json", entities)
+    _write_json_array(doc_output_dir / "mapping_results.json", mapping_results)
     
     # Generate HTML visualization
     html_file = doc_output_dir / "visualization.html"
@@ -202,24 +264,48 @@ def save_results(
 
 def display_mapping_summary(mapping_results: List[MappingResult]) -> None:
     """Display a summary table of mapping results."""
+    # A per-row table for thousands of entities is unreadable and pays
+    # rich's formatting cost per cell; past 200 rows print aggregate
+    # stats and the weakest matches instead
+    if len(mapping_results) > 200:
+        mapped = [r for r in mapping_results if r.mapped_entity_id is not None]
+        name_changes = sum(1 for r in mapping_results if r.name_change_detected)
+        console.print(
+            f"Mapped {len(mapped)} of {len(mapping_results)} entities "
+            f"({name_changes} name changes detected)"
+        )
+        weakest = sorted(mapped, key=lambda r: r.confidence)[:10]
+        if weakest:
+            console.print("Lowest-confidence matches:")
+            for result in weakest:
+                console.print(
+                    f"  {result.original_entity.name} → "
+                    f"{result.mapped_entity_name} ({result.confidence:.2f})"
+                )
+        return
+
     table = Table(title="Entity Mapping Summary")
-    
+
     table.add_column("Original Entity", style="cyan")
     table.add_column("Mapped To", style="green")
     table.add_column("Confidence", style="yellow")
     table.add_column("Name Change", style="magenta")
-    
-    for result in mapping_results:
-        original_name = result.original_entity.name
-        mapped_name = result.mapped_entity_name or "Not Mapped"
-        confidence = f"{result.confidence:.2f}" if result.confidence > 0 else "N/A"
-        
-        name_change = "No"
-        if result.name_change_detected and result.name_change:
-            name_change = f"{result.name_change.previous_name} → {result.name_change.current_name}"
-        
-        table.add_row(original_name, mapped_name, confidence, name_change)
-    
+
+    # Precompute the formatted rows in one comprehension, then feed the
+    # table in a tight loop
+    rows = [
+        (
+            result.original_entity.name,
+            result.mapped_entity_name or "Not Mapped",
+            f"{result.confidence:.2f}" if result.confidence > 0 else "N/A",
+            f"{result.name_change.previous_name} → {result.name_change.current_name}"
+            if result.name_change_detected and result.name_change else "No",
+        )
+        for result in mapping_results
+    ]
+    for row in rows:
+        table.add_row(*row)
+
     console.print(table)
 
 
@@ -0,0 +1,55 @@
+"""
+Regression tests for the fuzzy matching helpers in enhanced_matching.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FindBestMatchTest(unittest.TestCase):
+    """Test find_best_match against case-variant inputs."""
+
+    def test_case_variant_match(self):
+        """All-caps document names must match mixed-case database names."""
+        from src.entity_mapper.enhanced_matching import find_best_match
+        match = find_best_match("ACME CORP", ["Acme Corp"], threshold=0.7)
+        self.assertIsNotNone(match)
+        self.assertEqual(match[0], "Acme Corp")
+        self.assertGreaterEqual(match[1], 0.7)
+
+
+class MultiStageMatchingTest(unittest.TestCase):
+    """Test that the single-query and batch matchers agree."""
+
+    def test_single_and_batch_fuzzy_agree_on_case(self):
+        """Case-variant fuzzy matches must resolve the same in both paths."""
+        from src.entity_mapper.enhanced_matching import (
+            multi_stage_entity_matching,
+            multi_stage_entity_matching_batch,
+        )
+        candidates = [
+            {"name": "GT Express Incorporated"},
+            {"name": "Other Company"},
+        ]
+        single = multi_stage_entity_matching(
+            {"name": "gt express inc"}, candidates, []
+        )
+        batch = multi_stage_entity_matching_batch(
+            [{"name": "gt express inc"}], candidates, []
+        )[0]
+        self.assertEqual(single["method"], "fuzzy_match")
+        self.assertEqual(batch["method"], "fuzzy_match")
+        self.assertEqual(
+            single["matched_entity"]["name"], "GT Express Incorporated"
+        )
+        self.assertEqual(
+            batch["matched_entity"]["name"], "GT Express Incorporated"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
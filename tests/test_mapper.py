@@ -0,0 +1,55 @@
+"""
+Regression tests for the fuzzy search paths in EntityDatabase.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class BKTreeParityTest(unittest.TestCase):
+    """Test that the BK-tree and linear fuzzy paths return the same results."""
+
+    def _build_database(self):
+        """Database large enough to activate the BK-tree path."""
+        from src.entity_mapper.mapper import EntityDatabase, _BKTREE_MIN_CHOICES
+        db = EntityDatabase()
+        db.entities = [
+            # Longer than the query by two characters: at threshold 0.8 it
+            # sits right at the acceptance boundary (distance 2, score
+            # 1 - 2/11 ~ 0.818)
+            {"id": "c1", "name": "abcdefghikk", "aliases": []},
+        ] + [
+            {"id": f"pad{i:04d}", "name": f"zzz padding entity {i:04d}", "aliases": []}
+            for i in range(_BKTREE_MIN_CHOICES)
+        ]
+        db.name_changes = []
+        db._build_indexes()
+        return db
+
+    def test_bktree_matches_linear_at_threshold_boundary(self):
+        """Both paths must agree on a longer candidate at the boundary."""
+        db = self._build_database()
+        self.assertIsNotNone(db._bktree)
+
+        tree_results = db._search_by_name_uncached("abcdefghi", 0.8)
+
+        db._bktree = None
+        linear_results = db._search_by_name_uncached("abcdefghi", 0.8)
+
+        def summary(results):
+            return sorted(
+                (r["entity"]["id"], round(r["score"], 6)) for r in results
+            )
+
+        self.assertEqual(summary(tree_results), summary(linear_results))
+        self.assertEqual(
+            [r["entity"]["id"] for r in tree_results], ["c1"]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()